@@ -1,6 +1,7 @@
 """API routes package."""
 from fastapi import APIRouter
-from app.api.routes import auth, documents, chat, health, upload
+from app.api.routes import auth, documents, chat, health
+from app.schemas.document import UploadResponse
 
 # Create main API router
 api_router = APIRouter()
@@ -9,6 +10,13 @@ api_router = APIRouter()
 api_router.include_router(health.router, prefix="/health", tags=["Health"])
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(documents.router, prefix="/docs", tags=["Documents"])
-api_router.include_router(upload.router, prefix="/upload", tags=["Upload"])
 api_router.include_router(chat.router, prefix="/ask", tags=["Chat"])
 
+# Upload alias for POST /docs/upload, served by the same handler
+api_router.add_api_route(
+    "/upload",
+    documents.upload_documents,
+    methods=["POST"],
+    response_model=UploadResponse,
+    tags=["Upload"],
+)
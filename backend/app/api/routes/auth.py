@@ -46,7 +46,6 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     )
     db.add(user)
     await db.flush()
-    await db.refresh(user)
     
     # Create access token
     access_token = create_access_token(
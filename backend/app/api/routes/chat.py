@@ -1,22 +1,89 @@
 """Chat and Q&A API routes."""
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, delete, func
+from starlette.background import BackgroundTask
 
-from app.core.database import get_db
+from app.core.database import async_session_maker, get_db
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.chat import ChatMessage
-from app.schemas.chat import AskRequest, AskResponse, ChatHistoryResponse, ChatHistoryItem
+from app.schemas.chat import (
+    AskRequest,
+    AskResponse,
+    ChatHistoryResponse,
+    ChatHistoryItem,
+)
 from app.services.llm_service import llm_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+# Keep proxies (e.g. nginx, the Next.js rewrite) from buffering streamed answers
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a server-sent event."""
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+
+
+async def save_chat_message_background(result: Dict[str, Any], user_id: int):
+    """Background task to save a streamed answer to chat history."""
+    if not result:
+        return
+    
+    async with async_session_maker() as db:
+        try:
+            db.add(ChatMessage(
+                question=result["question"],
+                answer=result["answer"],
+                sources=result["sources"] or None,
+                processing_time=result["processing_time"],
+                user_id=user_id,
+            ))
+            await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to save streamed answer for user {user_id}: {str(e)}")
+
+
+def _stream_answer(question: str, user_id: int) -> StreamingResponse:
+    """Stream an answer as server-sent events and save it once complete."""
+    result: Dict[str, Any] = {}
+    
+    async def event_stream():
+        async for event in llm_service.answer_question_stream(
+            question=question,
+            user_id=user_id,
+            n_sources=5,
+        ):
+            if event["type"] == "token":
+                yield _format_sse("token", {"content": event["content"]})
+                continue
+            
+            # Final event: sources are serialized once for the client and storage
+            result.update(
+                answer=event["answer"],
+                sources=[s.model_dump() for s in event["sources"]],
+                processing_time=event["processing_time"],
+                question=event["question"],
+            )
+            yield _format_sse("done", result)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+        background=BackgroundTask(save_chat_message_background, result, user_id),
+    )
+
+
 @router.post("", response_model=AskResponse)
 async def ask_question(
     request: AskRequest,
@@ -30,38 +97,38 @@ async def ask_question(
     1. Search for relevant document chunks
     2. Use the context to generate an answer
     3. Return the answer with source references
+    
+    With `stream` set, the answer is sent as server-sent events: `token`
+    events while it is generated, then a `done` event with the full answer
+    and sources.
     """
-    try:
-        # Get answer from LLM service
-        result = await llm_service.answer_question(
-            question=request.question,
-            user_id=current_user.id,
-            n_sources=5,
-        )
-        
-        # Save to chat history
-        chat_message = ChatMessage(
-            question=request.question,
-            answer=result["answer"],
-            sources=[s.model_dump() for s in result["sources"]] if result["sources"] else None,
-            processing_time=result["processing_time"],
-            user_id=current_user.id,
-        )
-        db.add(chat_message)
-        
-        return AskResponse(
-            answer=result["answer"],
-            sources=result["sources"],
-            processing_time=result["processing_time"],
-            question=result["question"],
-        )
-        
-    except Exception as e:
-        logger.error(f"Failed to process question: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to process question: {str(e)}"
-        )
+    if request.stream:
+        return _stream_answer(request.question, current_user.id)
+    
+    # Get answer from LLM service
+    result = await llm_service.answer_question(
+        question=request.question,
+        user_id=current_user.id,
+        n_sources=5,
+    )
+    
+    # Save to chat history (sources are serialized once for storage)
+    sources = result["sources"]
+    chat_message = ChatMessage(
+        question=request.question,
+        answer=result["answer"],
+        sources=[s.model_dump() for s in sources] if sources else None,
+        processing_time=result["processing_time"],
+        user_id=current_user.id,
+    )
+    db.add(chat_message)
+    
+    return AskResponse(
+        answer=result["answer"],
+        sources=sources,
+        processing_time=result["processing_time"],
+        question=result["question"],
+    )
 
 
 @router.get("/history", response_model=ChatHistoryResponse)
@@ -77,40 +144,32 @@ async def get_chat_history(
     - `limit`: Number of messages to return (default: 50, max: 100)
     - `offset`: Number of messages to skip (for pagination)
     """
-    # Get total count
-    count_result = await db.execute(
-        select(func.count()).select_from(ChatMessage).where(
-            ChatMessage.user_id == current_user.id
-        )
-    )
-    total = count_result.scalar()
-    
-    # Get messages
+    # Get messages along with the total count in a single round trip
     result = await db.execute(
-        select(ChatMessage)
+        select(ChatMessage, func.count().over().label("total"))
         .where(ChatMessage.user_id == current_user.id)
         .order_by(ChatMessage.created_at.desc())
         .offset(offset)
         .limit(limit)
     )
-    messages = result.scalars().all()
+    rows = result.all()
+    messages = [row.ChatMessage for row in rows]
+    
+    if rows:
+        total = rows[0].total
+    elif offset:
+        # Page is past the end, so the window count is unavailable
+        count_result = await db.execute(
+            select(func.count()).select_from(ChatMessage).where(
+                ChatMessage.user_id == current_user.id
+            )
+        )
+        total = count_result.scalar()
+    else:
+        total = 0
     
-    # Convert to response format
-    history_items = []
-    for msg in messages:
-        sources = None
-        if msg.sources:
-            from app.schemas.chat import SourceDocument
-            sources = [SourceDocument(**s) for s in msg.sources]
-        
-        history_items.append(ChatHistoryItem(
-            id=msg.id,
-            question=msg.question,
-            answer=msg.answer,
-            sources=sources,
-            processing_time=msg.processing_time,
-            created_at=msg.created_at,
-        ))
+    # Convert to response format (stored source dicts validate into SourceDocument)
+    history_items = [ChatHistoryItem.model_validate(msg) for msg in messages]
     
     return ChatHistoryResponse(
         messages=history_items,
@@ -125,14 +184,10 @@ async def clear_chat_history(
 ):
     """Clear all chat history for current user."""
     result = await db.execute(
-        select(ChatMessage).where(ChatMessage.user_id == current_user.id)
+        delete(ChatMessage).where(ChatMessage.user_id == current_user.id)
     )
-    messages = result.scalars().all()
-    
-    for msg in messages:
-        await db.delete(msg)
     
-    return {"message": f"Cleared {len(messages)} messages from chat history"}
+    return {"message": f"Cleared {result.rowcount} messages from chat history"}
 
 
 @router.delete("/history/{message_id}")
@@ -143,20 +198,16 @@ async def delete_chat_message(
 ):
     """Delete a specific chat message."""
     result = await db.execute(
-        select(ChatMessage).where(
+        delete(ChatMessage).where(
             ChatMessage.id == message_id,
             ChatMessage.user_id == current_user.id
         )
     )
-    message = result.scalar_one_or_none()
     
-    if not message:
+    if not result.rowcount:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Message not found"
         )
     
-    await db.delete(message)
-    
     return {"message": "Chat message deleted successfully"}
-
@@ -1,14 +1,14 @@
 """Document management API routes."""
+import asyncio
 import logging
 from datetime import datetime
-from typing import List
-from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, delete, func
 
-from app.core.database import get_db
+from app.core.database import async_session_maker, get_db
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.document import Document, DocumentStatus
@@ -20,6 +20,9 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Maximum number of files saved to disk concurrently per upload request
+MAX_CONCURRENT_FILE_SAVES = 4
+
 
 async def process_document_background(
     document_id: int,
@@ -29,8 +32,6 @@ async def process_document_background(
     document_name: str,
 ):
     """Background task to process document and create embeddings."""
-    from app.core.database import async_session_maker
-    
     async with async_session_maker() as db:
         try:
             # Get document
@@ -55,7 +56,7 @@ async def process_document_background(
                 return
             
             # Split into chunks
-            chunks = document_processor.split_text(text)
+            chunks = await document_processor.split_text_async(text)
             
             if not chunks:
                 document.status = DocumentStatus.FAILED
@@ -94,6 +95,62 @@ async def process_document_background(
                 pass
 
 
+async def process_documents_background(documents: List[Dict[str, Any]]):
+    """
+    Background task to process several documents concurrently.
+    
+    Background tasks of a response run one after another, so a multi-file
+    upload is processed as one task that fans out over its documents, at most
+    MAX_CONCURRENT_UPLOADS at a time.
+    """
+    semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_UPLOADS)
+    
+    async def process_bounded(document: Dict[str, Any]):
+        async with semaphore:
+            await process_document_background(**document)
+    
+    await asyncio.gather(
+        *(process_bounded(document) for document in documents),
+        return_exceptions=True,
+    )
+
+
+async def _ingest_file(file: UploadFile, user_id: int) -> Optional[Document]:
+    """
+    Validate and save a single uploaded file.
+    
+    Returns:
+        The new (not yet added) Document record, or None if validation failed
+    """
+    # Validate file (size is re-checked while streaming to disk)
+    file_ext = document_processor.get_file_extension(file.filename)
+    is_valid, error_msg = document_processor.validate_file(
+        file.filename, file.size or 0
+    )
+    
+    if not is_valid:
+        logger.warning(f"File validation failed for {file.filename}: {error_msg}")
+        return None
+    
+    # Save file
+    try:
+        unique_filename, file_path, file_size = await document_processor.save_file(file)
+    except ValueError as e:
+        logger.warning(f"File validation failed for {file.filename}: {str(e)}")
+        return None
+    
+    # Create document record
+    return Document(
+        filename=unique_filename,
+        original_filename=file.filename,
+        file_path=file_path,
+        file_type=file_ext,
+        file_size=file_size,
+        status=DocumentStatus.PENDING,
+        user_id=user_id,
+    )
+
+
 @router.post("/upload", response_model=UploadResponse)
 async def upload_documents(
     background_tasks: BackgroundTasks,
@@ -114,61 +171,57 @@ async def upload_documents(
             detail="No files provided"
         )
     
-    uploaded_documents = []
-    successful = 0
+    # Validate and save files concurrently
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FILE_SAVES)
+    
+    async def ingest_bounded(file: UploadFile) -> Optional[Document]:
+        async with semaphore:
+            return await _ingest_file(file, current_user.id)
+    
+    results = await asyncio.gather(
+        *(ingest_bounded(file) for file in files),
+        return_exceptions=True,
+    )
+    
+    documents_to_add = []
     failed = 0
     
-    for file in files:
-        try:
-            # Read file content
-            content = await file.read()
-            
-            # Validate file
-            file_ext = Path(file.filename).suffix.lower()
-            is_valid, error_msg = document_processor.validate_file(
-                file.filename, len(content)
-            )
-            
-            if not is_valid:
-                logger.warning(f"File validation failed for {file.filename}: {error_msg}")
-                failed += 1
-                continue
-            
-            # Save file
-            unique_filename, file_path = await document_processor.save_file(
-                content, file.filename
-            )
-            
-            # Create document record
-            document = Document(
-                filename=unique_filename,
-                original_filename=file.filename,
-                file_path=file_path,
-                file_type=file_ext,
-                file_size=len(content),
-                status=DocumentStatus.PENDING,
-                user_id=current_user.id,
-            )
-            db.add(document)
-            await db.flush()
-            await db.refresh(document)
-            
-            # Schedule background processing
-            background_tasks.add_task(
-                process_document_background,
-                document.id,
-                file_path,
-                file_ext,
-                current_user.id,
-                file.filename,
-            )
-            
-            uploaded_documents.append(DocumentResponse.model_validate(document))
-            successful += 1
-            
-        except Exception as e:
-            logger.error(f"Failed to upload {file.filename}: {str(e)}")
+    for file, result in zip(files, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to upload {file.filename}: {str(result)}")
+            failed += 1
+        elif result is None:
             failed += 1
+        else:
+            documents_to_add.append(result)
+    
+    # Insert all document records in a single flush; the ID and the
+    # Python-side defaults (created_at, counts) are populated by the flush
+    uploaded_documents = []
+    if documents_to_add:
+        db.add_all(documents_to_add)
+        await db.flush()
+    
+    for document in documents_to_add:
+        uploaded_documents.append(DocumentResponse.model_validate(document))
+    
+    # Schedule background processing now that the IDs are assigned
+    if documents_to_add:
+        background_tasks.add_task(
+            process_documents_background,
+            [
+                {
+                    "document_id": document.id,
+                    "file_path": document.file_path,
+                    "file_type": document.file_type,
+                    "user_id": current_user.id,
+                    "document_name": document.original_filename,
+                }
+                for document in documents_to_add
+            ],
+        )
+    
+    successful = len(uploaded_documents)
     
     return UploadResponse(
         message=f"Upload completed: {successful} successful, {failed} failed",
@@ -192,17 +245,22 @@ async def list_documents(
     - Processing status
     - Chunk and embedding counts
     """
-    # Get documents
+    # Get documents with chunk/embedding totals aggregated by the database
     result = await db.execute(
-        select(Document)
+        select(
+            Document,
+            func.sum(Document.chunk_count).over().label("total_chunks"),
+            func.sum(Document.embedding_count).over().label("total_embeddings"),
+        )
         .where(Document.user_id == current_user.id)
         .order_by(Document.created_at.desc())
     )
-    documents = result.scalars().all()
+    rows = result.all()
+    documents = [row.Document for row in rows]
     
-    # Calculate totals
-    total_chunks = sum(doc.chunk_count for doc in documents)
-    total_embeddings = sum(doc.embedding_count for doc in documents)
+    # Totals are repeated on every row; an empty result means zero
+    total_chunks = rows[0].total_chunks if rows else 0
+    total_embeddings = rows[0].total_embeddings if rows else 0
     
     return DocumentListResponse(
         documents=[DocumentResponse.model_validate(doc) for doc in documents],
@@ -236,37 +294,40 @@ async def get_document(
     return DocumentResponse.model_validate(document)
 
 
-@router.delete("/{document_id}")
+@router.delete("/{document_id}", status_code=status.HTTP_202_ACCEPTED)
 async def delete_document(
     document_id: int,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Delete a document and its embeddings."""
+    """
+    Delete a document and its embeddings.
+    
+    The database record is removed immediately; embeddings and the stored
+    file are cleaned up in the background.
+    """
     result = await db.execute(
-        select(Document).where(
+        delete(Document)
+        .where(
             Document.id == document_id,
             Document.user_id == current_user.id
         )
+        .returning(Document.original_filename, Document.file_path)
     )
-    document = result.scalar_one_or_none()
+    deleted = result.first()
     
-    if not document:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
     
-    # Delete from vector store
-    await vector_store_service.delete_document(document_id)
-    
-    # Delete file from disk
-    await document_processor.delete_file(document.file_path)
-    
-    # Delete from database
-    await db.delete(document)
+    # Schedule vector store and disk cleanup
+    background_tasks.add_task(vector_store_service.delete_document, document_id)
+    background_tasks.add_task(document_processor.delete_file, deleted.file_path)
     
-    return {"message": f"Document '{document.original_filename}' deleted successfully"}
+    return {"message": f"Document '{deleted.original_filename}' queued for deletion"}
 
 
 @router.post("/{document_id}/reprocess")
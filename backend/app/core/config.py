@@ -1,6 +1,7 @@
 """Application configuration settings."""
 import os
 from typing import List
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -20,9 +21,14 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-super-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    BCRYPT_ROUNDS: int = 12  # bcrypt cost factor for new password hashes
     
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./knowledge_assistant.db"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 3600  # seconds
+    DB_POOL_PRE_PING: bool = True
     
     # LLM Provider: "openai" or "anthropic"
     LLM_PROVIDER: str = "anthropic"
@@ -37,18 +43,29 @@ class Settings(BaseSettings):
     ANTHROPIC_MODEL: str = "claude-haiku-4-5-20251001"
     
     # Vector store
+    EMBEDDING_BACKEND: str = "openai"  # "openai" or "local" (requires sentence-transformers)
+    LOCAL_EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    VECTOR_BACKEND: str = "chroma"  # "chroma" or "faiss" (requires faiss-cpu)
     VECTOR_STORE_PATH: str = "./vector_store"
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024  # cached query embeddings (0 disables)
     
     # File upload
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_EXTENSIONS: List[str] = [".txt", ".pdf"]
+    MAX_CONCURRENT_UPLOADS: int = 8  # documents processed concurrently per upload
     
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
     
+    @field_validator("EMBEDDING_BACKEND", "VECTOR_BACKEND")
+    @classmethod
+    def _lowercase_backend(cls, value: str) -> str:
+        """Accept backend names in any case."""
+        return value.lower()
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
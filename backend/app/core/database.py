@@ -1,20 +1,38 @@
 """Database configuration and session management."""
+import orjson
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
 
 
+# Pool sizing only applies to server databases; SQLite keeps the default
+# pool SQLAlchemy picks for its dialect
+engine_kwargs = {}
+if not settings.DATABASE_URL.startswith("sqlite"):
+    engine_kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
     future=True,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    # JSON columns (chat message sources) are encoded/decoded with orjson
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
+    **engine_kwargs,
 )
 
 # Create async session factory
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    # Keep loaded attributes after commit; with expiry every later attribute
+    # access would issue a refresh SELECT (or fail outside a greenlet)
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -4,11 +4,12 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
 from app.core.database import init_db, close_db
 from app.api import api_router
+from app.services.document_processor import document_processor
 
 # Configure logging
 logging.basicConfig(
@@ -40,6 +41,8 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down application")
     await close_db()
     logger.info("Database connection closed")
+    
+    document_processor.shutdown()
 
 
 # Create FastAPI application
@@ -73,6 +76,7 @@ A powerful knowledge management system that allows you to:
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
@@ -91,7 +95,7 @@ app.add_middleware(
 async def global_exception_handler(request, exc):
     """Global exception handler for unhandled errors."""
     logger.error(f"Unhandled error: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "An unexpected error occurred. Please try again later."}
     )
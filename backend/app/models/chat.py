@@ -1,6 +1,7 @@
 """Chat message database model."""
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import String, DateTime, ForeignKey, Text, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING, List, Optional
 
@@ -14,6 +15,10 @@ class ChatMessage(Base):
     """Chat message model for Q&A history."""
     
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # History is listed per user, newest first
+        Index("ix_chat_messages_user_id_created_at", "user_id", "created_at"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
@@ -22,7 +27,10 @@ class ChatMessage(Base):
     answer: Mapped[str] = mapped_column(Text, nullable=False)
     
     # Sources and metadata
-    sources: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # JSONB on Postgres stores parsed binary JSON instead of re-parsing text per read
+    sources: Mapped[Optional[dict]] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), nullable=True
+    )
     processing_time: Mapped[Optional[float]] = mapped_column(nullable=True)  # seconds
     
     # Timestamps
@@ -30,7 +38,9 @@ class ChatMessage(Base):
     
     # User relationship
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    user: Mapped["User"] = relationship("User", back_populates="chat_messages")
+    # raise_on_sql: history endpoints must eager-load the user explicitly rather
+    # than trigger a per-row lazy load under async
+    user: Mapped["User"] = relationship("User", back_populates="chat_messages", lazy="raise_on_sql")
     
     def __repr__(self) -> str:
         return f"<ChatMessage(id={self.id}, question={self.question[:50]}...)>"
@@ -1,6 +1,6 @@
 """Document database model."""
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
 import enum
@@ -23,6 +23,10 @@ class Document(Base):
     """Document model for uploaded files."""
     
     __tablename__ = "documents"
+    __table_args__ = (
+        # Documents are listed per user, newest first
+        Index("ix_documents_user_id_created_at", "user_id", "created_at"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -47,7 +51,9 @@ class Document(Base):
     
     # User relationship
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    owner: Mapped["User"] = relationship("User", back_populates="documents")
+    # raise_on_sql: list endpoints must eager-load the owner explicitly rather
+    # than trigger a per-row lazy load under async
+    owner: Mapped["User"] = relationship("User", back_populates="documents", lazy="raise_on_sql")
     
     def __repr__(self) -> str:
         return f"<Document(id={self.id}, filename={self.original_filename}, status={self.status})>"
@@ -62,7 +68,7 @@ class Document(Base):
             "status": self.status.value,
             "chunk_count": self.chunk_count,
             "embedding_count": self.embedding_count,
-            "content_preview": self.content_preview[:200] if self.content_preview else None,
+            "content_preview": self.content_preview,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "processed_at": self.processed_at.isoformat() if self.processed_at else None,
             "error_message": self.error_message,
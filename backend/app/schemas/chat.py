@@ -15,6 +15,7 @@ class SourceDocument(BaseModel):
 class AskRequest(BaseModel):
     """Schema for ask question request."""
     question: str = Field(..., min_length=1, max_length=2000)
+    stream: bool = False  # Return the answer as server-sent events
 
 
 class AskResponse(BaseModel):
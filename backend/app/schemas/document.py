@@ -7,7 +7,8 @@ from pydantic import BaseModel
 class DocumentResponse(BaseModel):
     """Schema for document response."""
     id: int
-    filename: str
+    filename: str  # Stored (unique) filename
+    original_filename: str  # Filename as uploaded
     file_type: str
     file_size: int
     status: str
@@ -1,7 +1,20 @@
 """Services package."""
-from app.services.document_processor import DocumentProcessor
-from app.services.vector_store import VectorStoreService
-from app.services.llm_service import LLMService
+import importlib
 
-__all__ = ["DocumentProcessor", "VectorStoreService", "LLMService"]
+# Service modules pull in heavy dependencies (LangChain, ChromaDB), so they
+# are imported on first attribute access instead of with the package
+_LAZY_IMPORTS = {
+    "DocumentProcessor": "app.services.document_processor",
+    "VectorStoreService": "app.services.vector_store",
+    "FaissVectorStoreService": "app.services.faiss_store",
+    "LLMService": "app.services.llm_service",
+}
 
+__all__ = ["DocumentProcessor", "VectorStoreService", "FaissVectorStoreService", "LLMService"]
+
+
+def __getattr__(name: str):
+    """Import service classes lazily."""
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,51 +1,307 @@
 """Document processing service for text extraction and chunking."""
 import os
+import re
 import uuid
+import asyncio
+import threading
+import multiprocessing
 import aiofiles
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Tuple, Optional
-from pathlib import Path
+from functools import lru_cache
+from typing import BinaryIO, List, Tuple, Optional
 
+import pypdfium2 as pdfium
+from fastapi import UploadFile
 from pypdf import PdfReader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 from app.core.config import settings
 
+# Read size used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 256 * 1024  # 256KB
+
+# Maximum length of the stored content preview, including the ellipsis
+CONTENT_PREVIEW_LENGTH = 200
+
+# Separators tried in order when splitting text into chunks
+TEXT_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+# Pages extracted per worker task; smaller PDFs are extracted in one thread
+PDF_PAGES_PER_TASK = 64
+
+# Texts longer than this are split in a worker process instead of a thread
+PROCESS_SPLIT_THRESHOLD = 1024 * 1024  # 1M characters
+
+# PDFium is not thread-safe, and the cached pypdf readers are shared, so PDF
+# work in this process's threads runs one document at a time
+_pdf_lock = threading.Lock()
+
+# Process pool for CPU-bound work (large PDFs and texts), created on first use
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Get the process pool, creating it if needed."""
+    global _process_pool
+    if _process_pool is None:
+        # Spawn rather than fork: forking a process that already runs threads
+        # can copy held locks into the workers and deadlock them
+        _process_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+@lru_cache(maxsize=8)
+def _load_pypdf_reader(file_path: str, mtime_ns: int, size: int) -> PdfReader:
+    """Parse a PDF with pypdf (cached per file version)."""
+    return PdfReader(file_path)
+
+
+def _get_pypdf_reader(file_path: str) -> PdfReader:
+    """Get a parsed pypdf reader, reusing it while the file is unchanged."""
+    stat = os.stat(file_path)
+    return _load_pypdf_reader(file_path, stat.st_mtime_ns, stat.st_size)
+
+
+def _extract_pdfium_pages(pdf: "pdfium.PdfDocument", start: int, end: int) -> List[str]:
+    """Extract non-empty page texts for pages [start, end) of an open PDFium document."""
+    text_parts = []
+    for page_number in range(start, end):
+        page = pdf[page_number]
+        textpage = page.get_textpage()
+        page_text = textpage.get_text_range().replace("\r\n", "\n")
+        textpage.close()
+        page.close()
+        if page_text.strip():
+            text_parts.append(page_text)
+    return text_parts
+
+
+def _extract_small_pdf(file_path: str) -> Tuple[int, Optional[List[str]]]:
+    """
+    Get the page count of a PDF and, if it fits in one task, its page texts.
+    
+    Small PDFs are thereby parsed once instead of once to count pages and
+    again to extract them. Runs in a thread, so it holds `_pdf_lock`.
+    """
+    with _pdf_lock:
+        return _extract_small_pdf_unlocked(file_path)
+
+
+def _extract_small_pdf_unlocked(file_path: str) -> Tuple[int, Optional[List[str]]]:
+    """Implementation of `_extract_small_pdf`; the caller holds `_pdf_lock`."""
+    try:
+        pdf = pdfium.PdfDocument(file_path)
+    except pdfium.PdfiumError:
+        # e.g. encrypted PDFs, which pypdf can still open
+        page_count = len(_get_pypdf_reader(file_path).pages)
+        if page_count > PDF_PAGES_PER_TASK:
+            return page_count, None
+        return page_count, _extract_page_range_pypdf(file_path, 0, page_count)
+    
+    try:
+        page_count = len(pdf)
+        if page_count > PDF_PAGES_PER_TASK:
+            return page_count, None
+        return page_count, _extract_pdfium_pages(pdf, 0, page_count)
+    finally:
+        pdf.close()
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """
+    Extract non-empty page texts for pages [start, end) of a PDF.
+    
+    Uses PDFium, falling back to pypdf for PDFs PDFium cannot open.
+    Whitespace and line breaks can differ slightly between the two.
+    """
+    with _pdf_lock:
+        try:
+            pdf = pdfium.PdfDocument(file_path)
+        except pdfium.PdfiumError:
+            return _extract_page_range_pypdf(file_path, start, end)
+        
+        try:
+            return _extract_pdfium_pages(pdf, start, end)
+        finally:
+            pdf.close()
+
+
+def _extract_page_range_pypdf(file_path: str, start: int, end: int) -> List[str]:
+    """Extract non-empty page texts for pages [start, end) of a PDF with pypdf."""
+    reader = _get_pypdf_reader(file_path)
+    text_parts = []
+    for page_number in range(start, end):
+        page_text = reader.pages[page_number].extract_text()
+        if page_text:
+            text_parts.append(page_text)
+    return text_parts
+
+
+class RecursiveTextSplitter:
+    """
+    Recursive character text splitter.
+    
+    Produces the same chunks as LangChain's RecursiveCharacterTextSplitter
+    with `keep_separator=True`, but compiles the separator patterns once
+    instead of on every call.
+    """
+    
+    def __init__(self, chunk_size: int, chunk_overlap: int, separators: List[str]):
+        """Initialize splitter and precompile separator patterns."""
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._separators = [
+            (separator, re.compile(f"({re.escape(separator)})") if separator else None)
+            for separator in separators
+        ]
+    
+    def split_text(self, text: str) -> List[str]:
+        """Split text into chunks of at most chunk_size characters."""
+        return self._split_text(text, self._separators)
+    
+    def _split_text(self, text: str, separators: list) -> List[str]:
+        """Split text with the first separator it contains, recursing into long pieces."""
+        # Get appropriate separator to use
+        pattern = None
+        new_separators = []
+        for i, (separator, separator_pattern) in enumerate(separators):
+            if not separator:
+                break
+            if separator in text:
+                pattern = separator_pattern
+                new_separators = separators[i + 1:]
+                break
+        
+        # Split, keeping each separator attached to the piece that follows it
+        if pattern is None:
+            splits = list(text)
+        else:
+            parts = pattern.split(text)
+            splits = [parts[0]]
+            splits.extend(parts[i] + parts[i + 1] for i in range(1, len(parts), 2))
+            splits = [split for split in splits if split]
+        
+        # Merge small pieces, recursively splitting pieces that are too long
+        chunk_size = self.chunk_size
+        final_chunks = []
+        good_splits = []
+        for split in splits:
+            if len(split) < chunk_size:
+                good_splits.append(split)
+                continue
+            if good_splits:
+                final_chunks.extend(self._merge_splits(good_splits))
+                good_splits = []
+            if new_separators:
+                final_chunks.extend(self._split_text(split, new_separators))
+            else:
+                final_chunks.append(split)
+        if good_splits:
+            final_chunks.extend(self._merge_splits(good_splits))
+        return final_chunks
+    
+    def _merge_splits(self, splits: List[str]) -> List[str]:
+        """Combine pieces into chunks, carrying up to chunk_overlap characters over."""
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+        docs = []
+        current_doc: List[str] = []
+        total = 0
+        start = 0
+        for split in splits:
+            split_len = len(split)
+            if total + split_len > chunk_size and start < len(current_doc):
+                doc = "".join(current_doc[start:]).strip()
+                if doc:
+                    docs.append(doc)
+                # Drop pieces from the front until the remainder fits as overlap
+                while total > chunk_overlap or (total + split_len > chunk_size and total > 0):
+                    total -= len(current_doc[start])
+                    start += 1
+            current_doc.append(split)
+            total += split_len
+        doc = "".join(current_doc[start:]).strip()
+        if doc:
+            docs.append(doc)
+        return docs
+
+
+def _split_text_in_worker(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """Split text into chunks in a worker process."""
+    splitter = RecursiveTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=TEXT_SEPARATORS,
+    )
+    return splitter.split_text(text)
+
 
 class DocumentProcessor:
     """Service for processing uploaded documents."""
     
     def __init__(self):
         """Initialize document processor with text splitter."""
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.text_splitter = RecursiveTextSplitter(
             chunk_size=settings.CHUNK_SIZE,
             chunk_overlap=settings.CHUNK_OVERLAP,
-            length_function=len,
-            separators=["\n\n", "\n", ". ", " ", ""]
+            separators=TEXT_SEPARATORS,
         )
+        self._allowed_extensions = frozenset(ext.lower() for ext in settings.ALLOWED_EXTENSIONS)
         self._ensure_upload_dir()
     
     def _ensure_upload_dir(self):
         """Ensure upload directory exists."""
         os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     
-    async def save_file(self, file_content: bytes, original_filename: str) -> Tuple[str, str]:
+    async def save_file(self, file: UploadFile) -> Tuple[str, str, int]:
         """
-        Save uploaded file to disk.
+        Stream uploaded file to disk in fixed-size chunks.
+        
+        The upload is never held in memory as a whole. The copy runs in a
+        single worker thread, and writing stops as soon as the running size
+        exceeds MAX_FILE_SIZE and the partial file is removed.
         
         Returns:
-            Tuple of (unique_filename, file_path)
+            Tuple of (unique_filename, file_path, file_size)
+            
+        Raises:
+            ValueError: If the file exceeds the maximum allowed size
         """
         # Generate unique filename
-        file_ext = Path(original_filename).suffix.lower()
+        file_ext = self.get_file_extension(file.filename)
         unique_filename = f"{uuid.uuid4().hex}{file_ext}"
         file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
         
-        # Save file asynchronously
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(file_content)
+        # Copy the spooled upload to disk off the event loop
+        try:
+            file_size = await asyncio.to_thread(self._write_upload, file.file, file_path)
+        except Exception:
+            await self.delete_file(file_path)
+            raise
         
-        return unique_filename, file_path
+        return unique_filename, file_path, file_size
+    
+    @staticmethod
+    def _write_upload(source: BinaryIO, file_path: str) -> int:
+        """Copy an upload to file_path chunk by chunk, returning its size."""
+        file_size = 0
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > settings.MAX_FILE_SIZE:
+                    max_mb = settings.MAX_FILE_SIZE / (1024 * 1024)
+                    raise ValueError(f"File size exceeds maximum allowed size of {max_mb}MB")
+                # os.write may write fewer bytes than requested
+                view = memoryview(chunk)
+                while view:
+                    view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        return file_size
     
     async def extract_text(self, file_path: str, file_type: str) -> str:
         """
@@ -74,15 +330,25 @@ class DocumentProcessor:
         return content.strip()
     
     async def _extract_text_from_pdf(self, file_path: str) -> str:
-        """Extract text from a .pdf file."""
+        """
+        Extract text from a .pdf file.
+        
+        Page ranges of large PDFs are extracted in parallel worker processes;
+        extraction never runs on the event loop.
+        """
         try:
-            reader = PdfReader(file_path)
-            text_parts = []
+            page_count, text_parts = await asyncio.to_thread(_extract_small_pdf, file_path)
             
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
+            if text_parts is None:
+                loop = asyncio.get_running_loop()
+                pool = _get_process_pool()
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(
+                        pool, _extract_page_range, file_path, start, min(start + PDF_PAGES_PER_TASK, page_count)
+                    )
+                    for start in range(0, page_count, PDF_PAGES_PER_TASK)
+                ])
+                text_parts = [part for parts in results for part in parts]
             
             return "\n\n".join(text_parts).strip()
         except Exception as e:
@@ -104,11 +370,34 @@ class DocumentProcessor:
         chunks = self.text_splitter.split_text(text)
         return chunks
     
-    def get_content_preview(self, text: str, max_length: int = 500) -> str:
-        """Get a preview of the text content."""
+    async def split_text_async(self, text: str) -> List[str]:
+        """
+        Split text into chunks off the event loop.
+        
+        Texts above PROCESS_SPLIT_THRESHOLD characters are split in the process
+        pool, where they do not compete for the GIL; others in a thread.
+        """
+        if len(text) > PROCESS_SPLIT_THRESHOLD:
+            loop = asyncio.get_running_loop()
+            # Only the text and chunk settings are sent to the worker
+            return await loop.run_in_executor(
+                _get_process_pool(),
+                _split_text_in_worker,
+                text,
+                self.text_splitter.chunk_size,
+                self.text_splitter.chunk_overlap,
+            )
+        return await asyncio.to_thread(self.split_text, text)
+    
+    def get_content_preview(self, text: str, max_length: int = CONTENT_PREVIEW_LENGTH) -> str:
+        """Get a preview of the text content, at most max_length characters."""
         if len(text) <= max_length:
             return text
-        return text[:max_length] + "..."
+        return text[:max_length - 3] + "..."
+    
+    def get_file_extension(self, filename: str) -> str:
+        """Get the lowercased extension of a filename (e.g. '.pdf'), or ''."""
+        return os.path.splitext(filename)[1].lower()
     
     def validate_file(self, filename: str, file_size: int) -> Tuple[bool, Optional[str]]:
         """
@@ -118,8 +407,8 @@ class DocumentProcessor:
             Tuple of (is_valid, error_message)
         """
         # Check file extension
-        file_ext = Path(filename).suffix.lower()
-        if file_ext not in settings.ALLOWED_EXTENSIONS:
+        file_ext = self.get_file_extension(filename)
+        if file_ext not in self._allowed_extensions:
             return False, f"File type '{file_ext}' not allowed. Allowed types: {settings.ALLOWED_EXTENSIONS}"
         
         # Check file size
@@ -129,6 +418,13 @@ class DocumentProcessor:
         
         return True, None
     
+    def shutdown(self):
+        """Shut down the process pool, if it was started."""
+        global _process_pool
+        if _process_pool is not None:
+            _process_pool.shutdown(cancel_futures=True)
+            _process_pool = None
+    
     async def delete_file(self, file_path: str) -> bool:
         """Delete a file from disk."""
         try:
@@ -0,0 +1,300 @@
+"""Vector store service using FAISS for document embeddings."""
+import os
+import sqlite3
+import logging
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+
+import faiss
+import numpy as np
+
+from app.core.config import settings
+from app.services.vector_store import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+
+class FaissVectorStoreService(VectorStoreService):
+    """
+    Service for managing document embeddings with FAISS.
+    
+    Each user gets an exact inner-product index (IndexFlatIP) over
+    L2-normalized embeddings, so scores are cosine similarities and searches
+    never scan other users' chunks. Chunk text and metadata are kept in a
+    SQLite table keyed by FAISS id.
+    """
+    
+    def __init__(self):
+        """Initialize FAISS vector store service."""
+        super().__init__()
+        self._db: Optional[sqlite3.Connection] = None
+        self._indexes: Dict[int, faiss.Index] = {}
+        self._index_dir = os.path.join(settings.VECTOR_STORE_PATH, "faiss")
+    
+    def _ensure_initialized(self):
+        """Ensure vector store is initialized."""
+        if self._initialized:
+            return
+        
+        # Ensure index directory exists
+        os.makedirs(self._index_dir, exist_ok=True)
+        
+        # Chunk text and metadata, keyed by FAISS id
+        self._db = sqlite3.connect(
+            os.path.join(settings.VECTOR_STORE_PATH, "faiss_chunks.db"),
+            check_same_thread=False,
+        )
+        self._db.row_factory = sqlite3.Row
+        with self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    document_id INTEGER NOT NULL,
+                    document_name TEXT NOT NULL,
+                    chunk_index INTEGER NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_chunks_document_id ON chunks (document_id)"
+            )
+        
+        self._init_embeddings()
+        
+        self._initialized = True
+        logger.info("FAISS vector store initialized successfully")
+    
+    def _index_path(self, user_id: int) -> str:
+        """Get the file path of a user's index."""
+        return os.path.join(self._index_dir, f"user_{user_id}.index")
+    
+    def _get_index(self, user_id: int, dim: Optional[int] = None) -> Optional[faiss.Index]:
+        """
+        Get a user's index, loading it from disk if needed.
+        
+        A new index is created only when `dim` is given.
+        """
+        index = self._indexes.get(user_id)
+        if index is not None:
+            return index
+        
+        path = self._index_path(user_id)
+        if os.path.exists(path):
+            index = faiss.read_index(path)
+        elif dim is not None:
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+        else:
+            return None
+        
+        self._indexes[user_id] = index
+        return index
+    
+    def _save_index(self, user_id: int):
+        """Persist a user's index to disk."""
+        faiss.write_index(self._indexes[user_id], self._index_path(user_id))
+    
+    @staticmethod
+    def _to_unit_vectors(embeddings: List[List[float]]) -> np.ndarray:
+        """Convert embeddings to an L2-normalized float32 matrix."""
+        vectors = np.array(embeddings, dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        return vectors
+    
+    async def add_documents(
+        self,
+        chunks: List[str],
+        document_id: int,
+        document_name: str,
+        user_id: int,
+    ) -> int:
+        """
+        Add document chunks to vector store.
+        
+        Args:
+            chunks: List of text chunks
+            document_id: Database document ID
+            document_name: Original filename
+            user_id: Owner user ID
+        
+        Returns:
+            Number of embeddings created
+        """
+        self._ensure_initialized()
+        
+        if not chunks:
+            return 0
+        
+        try:
+            # Generate embeddings
+            vectors = self._to_unit_vectors(self._embed_documents(chunks))
+            created_at = datetime.utcnow().isoformat()
+            
+            # Store chunks and index vectors together; the rows roll back if
+            # the index update fails
+            with self._db:
+                ids = [
+                    self._db.execute(
+                        "INSERT INTO chunks (user_id, document_id, document_name, chunk_index, content, created_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (user_id, document_id, document_name, i, chunk, created_at),
+                    ).lastrowid
+                    for i, chunk in enumerate(chunks)
+                ]
+                index = self._get_index(user_id, dim=vectors.shape[1])
+                index.add_with_ids(vectors, np.array(ids, dtype=np.int64))
+                self._save_index(user_id)
+            
+            logger.info(f"Added {len(chunks)} chunks for document {document_id}")
+            return len(chunks)
+        
+        except Exception as e:
+            logger.error(f"Failed to add documents to vector store: {str(e)}")
+            raise
+    
+    async def search(
+        self,
+        query: str,
+        user_id: int,
+        n_results: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for relevant document chunks.
+        
+        Args:
+            query: Search query
+            user_id: User ID to filter results
+            n_results: Number of results to return
+        
+        Returns:
+            List of matching documents with scores
+        """
+        self._ensure_initialized()
+        
+        try:
+            index = self._get_index(user_id)
+            if index is None or index.ntotal == 0:
+                return []
+            
+            # Search the user's index
+            query_vector = self._to_unit_vectors([self._get_query_embedding(query)])
+            scores, ids = index.search(query_vector, min(n_results, index.ntotal))
+            
+            # Look up chunk text and metadata
+            hits = [(float(score), int(chunk_id)) for score, chunk_id in zip(scores[0], ids[0]) if chunk_id != -1]
+            placeholders = ",".join("?" * len(hits))
+            rows = {
+                row["id"]: row
+                for row in self._db.execute(
+                    f"SELECT * FROM chunks WHERE id IN ({placeholders})",
+                    [chunk_id for _, chunk_id in hits],
+                )
+            }
+            
+            # Format results
+            formatted_results = []
+            for score, chunk_id in hits:
+                row = rows.get(chunk_id)
+                if row is None:
+                    continue
+                
+                formatted_results.append({
+                    "id": f"doc_{row['document_id']}_chunk_{row['chunk_index']}",
+                    "content": row["content"],
+                    "metadata": {
+                        "document_id": row["document_id"],
+                        "document_name": row["document_name"],
+                        "user_id": row["user_id"],
+                        "chunk_index": row["chunk_index"],
+                        "created_at": row["created_at"],
+                    },
+                    "relevance_score": round(score, 4),
+                })
+            
+            return formatted_results
+        
+        except Exception as e:
+            logger.error(f"Vector search failed: {str(e)}")
+            return []
+    
+    async def delete_document(self, document_id: int) -> bool:
+        """
+        Delete all chunks for a document from vector store.
+        
+        Args:
+            document_id: Document ID to delete
+        
+        Returns:
+            True if successful
+        """
+        self._ensure_initialized()
+        
+        try:
+            rows = self._db.execute(
+                "SELECT id, user_id FROM chunks WHERE document_id = ?",
+                (document_id,),
+            ).fetchall()
+            
+            if not rows:
+                return True
+            
+            # Remove vectors from each owner's index
+            ids_by_user: Dict[int, List[int]] = {}
+            for row in rows:
+                ids_by_user.setdefault(row["user_id"], []).append(row["id"])
+            
+            with self._db:
+                self._db.execute("DELETE FROM chunks WHERE document_id = ?", (document_id,))
+                for user_id, ids in ids_by_user.items():
+                    index = self._get_index(user_id)
+                    if index is not None:
+                        index.remove_ids(np.array(ids, dtype=np.int64))
+                        self._save_index(user_id)
+            
+            logger.info(f"Deleted {len(rows)} chunks for document {document_id}")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Failed to delete document from vector store: {str(e)}")
+            return False
+    
+    async def get_document_count(self, user_id: int) -> int:
+        """Get total number of document chunks for a user."""
+        self._ensure_initialized()
+        
+        try:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM chunks WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+        except Exception:
+            return 0
+    
+    async def get_total_count(self) -> int:
+        """Get total number of document chunks in the store."""
+        self._ensure_initialized()
+        
+        try:
+            return self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        except Exception:
+            return 0
+    
+    async def reset(self):
+        """Reset the vector store (delete all data)."""
+        self._ensure_initialized()
+        
+        try:
+            with self._db:
+                self._db.execute("DELETE FROM chunks")
+            
+            self._indexes.clear()
+            for filename in os.listdir(self._index_dir):
+                if filename.endswith(".index"):
+                    os.remove(os.path.join(self._index_dir, filename))
+            
+            logger.info("Vector store reset successfully")
+        except Exception as e:
+            logger.error(f"Failed to reset vector store: {str(e)}")
+            raise
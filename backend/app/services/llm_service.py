@@ -1,12 +1,10 @@
-"""LLM service for question answering using LangChain."""
+"""LLM service for question answering using the OpenAI and Anthropic SDKs."""
 import logging
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema import HumanMessage, SystemMessage
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
 
 from app.core.config import settings
 from app.services.vector_store import vector_store_service
@@ -15,6 +13,11 @@ from app.schemas.chat import SourceDocument
 logger = logging.getLogger(__name__)
 
 
+# Generation settings per provider
+TEMPERATURE = 0.7
+OPENAI_MAX_TOKENS = 1000
+ANTHROPIC_MAX_TOKENS = 1024
+
 # System prompt for the AI assistant
 SYSTEM_PROMPT = """You are a helpful AI knowledge assistant. Your role is to answer questions based on the provided context from uploaded documents.
 
@@ -32,13 +35,20 @@ CONTEXT FROM DOCUMENTS:
 
 Please answer the user's question based on the above context. If the context doesn't contain relevant information, let the user know and suggest they upload more relevant documents."""
 
+# SYSTEM_PROMPT split around its {context} placeholder, so building a prompt is
+# plain concatenation instead of str.format parsing on every question
+_PROMPT_PREFIX, _PROMPT_SUFFIX = SYSTEM_PROMPT.split("{context}")
+
+# Header and content of one source in the context
+_format_source = "[Source {}: {} (Relevance: {:.2%})]\n{}".format
+
 
 class LLMService:
     """Service for LLM-powered question answering."""
     
     def __init__(self):
         """Initialize LLM service."""
-        self._llm = None
+        self._client = None
         self._initialized = False
         self._provider = None
         self._model_name = None
@@ -52,53 +62,33 @@ class LLMService:
         
         # Try Anthropic/Claude first if selected
         if provider == "anthropic" and settings.ANTHROPIC_API_KEY:
-            self._llm = ChatAnthropic(
-                anthropic_api_key=settings.ANTHROPIC_API_KEY,
-                model=settings.ANTHROPIC_MODEL,
-                temperature=0.7,
-                max_tokens=1024,
-            )
+            self._client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
             self._provider = "anthropic"
             self._model_name = settings.ANTHROPIC_MODEL
             logger.info(f"Initialized Claude LLM with model: {settings.ANTHROPIC_MODEL}")
         
         # Fall back to OpenAI if selected or if Anthropic not configured
         elif provider == "openai" and settings.OPENAI_API_KEY:
-            self._llm = ChatOpenAI(
-                openai_api_key=settings.OPENAI_API_KEY,
-                model=settings.OPENAI_MODEL,
-                temperature=0.7,
-                max_tokens=1000,
-            )
+            self._client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
             self._provider = "openai"
             self._model_name = settings.OPENAI_MODEL
             logger.info(f"Initialized OpenAI LLM with model: {settings.OPENAI_MODEL}")
         
         # Try any available provider if preferred one not configured
         elif settings.ANTHROPIC_API_KEY:
-            self._llm = ChatAnthropic(
-                anthropic_api_key=settings.ANTHROPIC_API_KEY,
-                model=settings.ANTHROPIC_MODEL,
-                temperature=0.7,
-                max_tokens=1024,
-            )
+            self._client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
             self._provider = "anthropic"
             self._model_name = settings.ANTHROPIC_MODEL
             logger.info(f"Fallback to Claude LLM with model: {settings.ANTHROPIC_MODEL}")
         
         elif settings.OPENAI_API_KEY:
-            self._llm = ChatOpenAI(
-                openai_api_key=settings.OPENAI_API_KEY,
-                model=settings.OPENAI_MODEL,
-                temperature=0.7,
-                max_tokens=1000,
-            )
+            self._client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
             self._provider = "openai"
             self._model_name = settings.OPENAI_MODEL
             logger.info(f"Fallback to OpenAI LLM with model: {settings.OPENAI_MODEL}")
         
         else:
-            self._llm = None
+            self._client = None
             self._provider = "mock"
             self._model_name = "mock"
             logger.warning("No API key set (ANTHROPIC_API_KEY or OPENAI_API_KEY). Using mock responses.")
@@ -123,20 +113,87 @@ The documents contain information that may be relevant to your query about "{que
     
     def _format_context(self, search_results: List[Dict[str, Any]]) -> str:
         """Format search results into context string."""
-        if not search_results:
-            return ""
-        
-        context_parts = []
-        for i, result in enumerate(search_results, 1):
-            doc_name = result.get('metadata', {}).get('document_name', 'Unknown')
-            content = result.get('content', '')
-            score = result.get('relevance_score', 0)
-            
-            context_parts.append(
-                f"[Source {i}: {doc_name} (Relevance: {score:.2%})]\n{content}"
+        return "\n\n---\n\n".join(
+            _format_source(
+                i,
+                result.get('metadata', {}).get('document_name', 'Unknown'),
+                result.get('relevance_score', 0),
+                result.get('content', ''),
             )
+            for i, result in enumerate(search_results, 1)
+        )
+    
+    def _build_system_prompt(self, context: str) -> str:
+        """Build the system prompt sent to the LLM."""
+        return _PROMPT_PREFIX + context + _PROMPT_SUFFIX
+    
+    async def _generate(self, question: str, context: str) -> str:
+        """Generate a complete answer with the configured provider."""
+        system_prompt = self._build_system_prompt(context)
+        
+        if self._provider == "anthropic":
+            response = await self._client.messages.create(
+                model=self._model_name,
+                system=system_prompt,
+                messages=[{"role": "user", "content": question}],
+                temperature=TEMPERATURE,
+                max_tokens=ANTHROPIC_MAX_TOKENS,
+            )
+            return "".join(block.text for block in response.content if block.type == "text")
         
-        return "\n\n---\n\n".join(context_parts)
+        response = await self._client.chat.completions.create(
+            model=self._model_name,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": question},
+            ],
+            temperature=TEMPERATURE,
+            max_tokens=OPENAI_MAX_TOKENS,
+        )
+        return response.choices[0].message.content or ""
+    
+    async def _generate_stream(self, question: str, context: str) -> AsyncIterator[str]:
+        """Generate an answer with the configured provider, yielding text deltas."""
+        system_prompt = self._build_system_prompt(context)
+        
+        if self._provider == "anthropic":
+            async with self._client.messages.stream(
+                model=self._model_name,
+                system=system_prompt,
+                messages=[{"role": "user", "content": question}],
+                temperature=TEMPERATURE,
+                max_tokens=ANTHROPIC_MAX_TOKENS,
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+            return
+        
+        stream = await self._client.chat.completions.create(
+            model=self._model_name,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": question},
+            ],
+            temperature=TEMPERATURE,
+            max_tokens=OPENAI_MAX_TOKENS,
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    def _format_sources(self, search_results: List[Dict[str, Any]]) -> List[SourceDocument]:
+        """Format search results into source references."""
+        sources = []
+        for result in search_results:
+            metadata = result.get('metadata', {})
+            sources.append(SourceDocument(
+                content=result.get('content', '')[:500],  # Limit content length
+                document_name=metadata.get('document_name', 'Unknown'),
+                chunk_index=metadata.get('chunk_index', 0),
+                relevance_score=result.get('relevance_score', 0),
+            ))
+        return sources
     
     async def answer_question(
         self,
@@ -170,28 +227,14 @@ The documents contain information that may be relevant to your query about "{que
             context = self._format_context(search_results)
             
             # Generate answer
-            if self._llm:
-                # Use LangChain with OpenAI
-                messages = [
-                    SystemMessage(content=SYSTEM_PROMPT.format(context=context)),
-                    HumanMessage(content=question),
-                ]
-                response = self._llm.invoke(messages)
-                answer = response.content
+            if self._client:
+                answer = await self._generate(question, context)
             else:
                 # Use mock response
                 answer = self._get_mock_response(question, context)
             
             # Format sources
-            sources = []
-            for result in search_results:
-                metadata = result.get('metadata', {})
-                sources.append(SourceDocument(
-                    content=result.get('content', '')[:500],  # Limit content length
-                    document_name=metadata.get('document_name', 'Unknown'),
-                    chunk_index=metadata.get('chunk_index', 0),
-                    relevance_score=result.get('relevance_score', 0),
-                ))
+            sources = self._format_sources(search_results)
             
             processing_time = time.time() - start_time
             
@@ -213,15 +256,88 @@ The documents contain information that may be relevant to your query about "{que
                 "question": question,
             }
     
+    async def answer_question_stream(
+        self,
+        question: str,
+        user_id: int,
+        n_sources: int = 5,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answer a question, yielding the answer as it is generated.
+        
+        Args:
+            question: User's question
+            user_id: User ID for document filtering
+            n_sources: Number of source documents to retrieve
+            
+        Yields:
+            ``{"type": "token", "content": str}`` events while the answer is
+            generated, then one ``{"type": "done", ...}`` event with the full
+            answer, sources, processing time and question
+        """
+        self._ensure_initialized()
+        start_time = time.time()
+        answer_parts = []
+        sources = []
+        
+        try:
+            # Retrieve relevant documents
+            search_results = await vector_store_service.search(
+                query=question,
+                user_id=user_id,
+                n_results=n_sources,
+            )
+            
+            # Format context
+            context = self._format_context(search_results)
+            
+            # Generate answer
+            if self._client:
+                async for text in self._generate_stream(question, context):
+                    if text:
+                        answer_parts.append(text)
+                        yield {"type": "token", "content": text}
+            else:
+                answer = self._get_mock_response(question, context)
+                answer_parts.append(answer)
+                yield {"type": "token", "content": answer}
+            
+            # Format sources
+            sources = self._format_sources(search_results)
+            
+        except Exception as e:
+            logger.error(f"Failed to answer question: {str(e)}")
+            error = f"I encountered an error while processing your question: {str(e)}. Please try again."
+            if answer_parts:
+                # Keep the part of the answer the client already received
+                error = f"\n\n{error}"
+            answer_parts.append(error)
+            sources = []
+            yield {"type": "token", "content": error}
+        
+        processing_time = time.time() - start_time
+        
+        yield {
+            "type": "done",
+            "answer": "".join(answer_parts),
+            "sources": sources,
+            "processing_time": round(processing_time, 3),
+            "question": question,
+        }
+    
     async def health_check(self) -> Dict[str, Any]:
         """Check if LLM service is healthy."""
         self._ensure_initialized()
         
         return {
-            "llm_available": self._llm is not None,
+            "llm_available": self._client is not None,
             "provider": self._provider,
             "model": self._model_name,
-            "embedding_model": settings.OPENAI_EMBEDDING_MODEL,
+            "embedding_model": (
+                settings.LOCAL_EMBEDDING_MODEL
+                if settings.EMBEDDING_BACKEND == "local"
+                else settings.OPENAI_EMBEDDING_MODEL
+            ),
         }
 
 
@@ -1,22 +1,70 @@
 """Vector store service using ChromaDB for document embeddings."""
 import os
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 # Disable ChromaDB telemetry before import
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
 os.environ["CHROMA_TELEMETRY"] = "False"
 
+import numpy as np
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 from langchain_openai import OpenAIEmbeddings
 from langchain.schema import Document as LangChainDocument
 
+try:
+    from blake3 import blake3
+except ImportError:  # Optional: mock embeddings fall back to SHA-256
+    blake3 = None
+
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Dimension of mock embeddings (matches OpenAI text-embedding-3-small)
+MOCK_EMBEDDING_DIM = 1536
+
+# HNSW settings for new collections. Vectors are buffered and indexed in batches
+# of hnsw:batch_size, and the index is written to disk every hnsw:sync_threshold
+# vectors (ChromaDB's defaults are 100 and 1000). Unsynced vectors are replayed
+# from ChromaDB's write-ahead log on restart.
+COLLECTION_METADATA = {
+    "hnsw:space": "ip",
+    "hnsw:batch_size": 1000,
+    "hnsw:sync_threshold": 10000,
+}
+
+
+def _normalize(embeddings) -> np.ndarray:
+    """L2-normalize embeddings row-wise as float32."""
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=-1, keepdims=True) + 1e-12
+    return vectors
+
+
+class LocalEmbeddings:
+    """Embeddings computed in-process with a sentence-transformers model."""
+    
+    def __init__(self, model_name: str):
+        """Load the sentence-transformers model (on GPU when available)."""
+        from sentence_transformers import SentenceTransformer
+        
+        self._model = SentenceTransformer(model_name)
+    
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embed document chunks."""
+        return self._model.encode(
+            texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True
+        )
+    
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embed a search query."""
+        return self._model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
+
 
 class VectorStoreService:
     """Service for managing document embeddings with ChromaDB."""
@@ -27,6 +75,10 @@ class VectorStoreService:
         self._collection = None
         self._embeddings = None
         self._initialized = False
+        # Memoize query embeddings; repeated questions skip the embedding API
+        self._embed_query_cached = lru_cache(
+            maxsize=settings.QUERY_EMBEDDING_CACHE_SIZE
+        )(self._embed_query)
     
     def _ensure_initialized(self):
         """Ensure vector store is initialized."""
@@ -45,14 +97,26 @@ class VectorStoreService:
             )
         )
         
-        # Get or create collection
+        # Get or create collection. Embeddings are stored unit-length, so inner
+        # product equals cosine similarity without per-query normalization.
+        # Collections created earlier keep their cosine space, which gives the
+        # same distances on unit-length vectors, and their HNSW settings.
         self._collection = self._client.get_or_create_collection(
             name="knowledge_base",
-            metadata={"hnsw:space": "cosine"}
+            metadata=COLLECTION_METADATA,
         )
         
-        # Initialize OpenAI embeddings (will use mock if no API key)
-        if settings.OPENAI_API_KEY:
+        self._init_embeddings()
+        
+        self._initialized = True
+        logger.info("Vector store initialized successfully")
+    
+    def _init_embeddings(self):
+        """Initialize local or OpenAI embeddings (will use mock if no API key)."""
+        if settings.EMBEDDING_BACKEND == "local":
+            self._embeddings = LocalEmbeddings(settings.LOCAL_EMBEDDING_MODEL)
+            logger.info(f"Using local embeddings with model: {settings.LOCAL_EMBEDDING_MODEL}")
+        elif settings.OPENAI_API_KEY:
             self._embeddings = OpenAIEmbeddings(
                 openai_api_key=settings.OPENAI_API_KEY,
                 model=settings.OPENAI_EMBEDDING_MODEL,
@@ -60,22 +124,46 @@ class VectorStoreService:
         else:
             self._embeddings = None
             logger.warning("OpenAI API key not set. Using mock embeddings.")
+    
+    def _get_mock_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate mock embeddings (one row per text) for testing without OpenAI API."""
+        # Create deterministic embeddings based on text hashes
+        if blake3 is not None:
+            # BLAKE3 output is extendable, so one digest covers the full dimension
+            digests = b"".join(blake3(text.encode()).digest(length=MOCK_EMBEDDING_DIM) for text in texts)
+            hash_bytes = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), MOCK_EMBEDDING_DIM)
+            return (hash_bytes / 255.0) * 2 - 1
         
-        self._initialized = True
-        logger.info("Vector store initialized successfully")
+        digests = b"".join(hashlib.sha256(text.encode()).digest() for text in texts)
+        hash_bytes = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), -1)
+        # Repeat each hash out to the embedding dimension, normalized to [-1, 1]
+        repeats = -(-MOCK_EMBEDDING_DIM // hash_bytes.shape[1])
+        tiled = np.tile(hash_bytes, repeats)[:, :MOCK_EMBEDDING_DIM]
+        return (tiled / 255.0) * 2 - 1
     
     def _get_mock_embedding(self, text: str) -> List[float]:
         """Generate a mock embedding for testing without OpenAI API."""
-        import hashlib
-        # Create a deterministic embedding based on text hash
-        hash_bytes = hashlib.sha256(text.encode()).digest()
-        # Convert to 1536-dimensional vector (OpenAI embedding dimension)
-        embedding = []
-        for i in range(1536):
-            byte_idx = i % len(hash_bytes)
-            # Normalize to [-1, 1] range
-            embedding.append((hash_bytes[byte_idx] / 255.0) * 2 - 1)
-        return embedding
+        return self._get_mock_embeddings([text])[0].tolist()
+    
+    def _embed_query(self, query: str) -> Tuple[float, ...]:
+        """Embed a search query, unit-length (returned as a tuple so it can be cached)."""
+        if self._embeddings:
+            embedding = self._embeddings.embed_query(query)
+        else:
+            embedding = self._get_mock_embedding(query)
+        return tuple(_normalize(embedding).tolist())
+    
+    def _get_query_embedding(self, query: str) -> List[float]:
+        """Get the embedding for a search query (cached by normalized query text)."""
+        return list(self._embed_query_cached(query.strip().lower()))
+    
+    def _embed_documents(self, chunks: List[str]) -> List[List[float]]:
+        """Generate unit-length embeddings for document chunks."""
+        if self._embeddings:
+            embeddings = self._embeddings.embed_documents(chunks)
+        else:
+            embeddings = self._get_mock_embeddings(chunks)
+        return _normalize(embeddings).tolist()
     
     async def add_documents(
         self,
@@ -103,10 +191,7 @@ class VectorStoreService:
         
         try:
             # Generate embeddings
-            if self._embeddings:
-                embeddings = self._embeddings.embed_documents(chunks)
-            else:
-                embeddings = [self._get_mock_embedding(chunk) for chunk in chunks]
+            embeddings = self._embed_documents(chunks)
             
             # Prepare documents for ChromaDB
             ids = [f"doc_{document_id}_chunk_{i}" for i in range(len(chunks))]
@@ -157,10 +242,7 @@ class VectorStoreService:
         
         try:
             # Generate query embedding
-            if self._embeddings:
-                query_embedding = self._embeddings.embed_query(query)
-            else:
-                query_embedding = self._get_mock_embedding(query)
+            query_embedding = self._get_query_embedding(query)
             
             # Get total count to avoid requesting more results than available
             total_count = self._collection.count()
@@ -178,7 +260,7 @@ class VectorStoreService:
             formatted_results = []
             if results and results['ids'] and results['ids'][0]:
                 for i, doc_id in enumerate(results['ids'][0]):
-                    # Convert distance to similarity score (cosine distance)
+                    # Convert distance to similarity score (1 - dot product)
                     distance = results['distances'][0][i] if results['distances'] else 0
                     similarity = 1 - distance  # Convert to similarity
                     
@@ -254,7 +336,7 @@ class VectorStoreService:
             self._client.delete_collection("knowledge_base")
             self._collection = self._client.create_collection(
                 name="knowledge_base",
-                metadata={"hnsw:space": "cosine"}
+                metadata=COLLECTION_METADATA,
             )
             logger.info("Vector store reset successfully")
         except Exception as e:
@@ -262,6 +344,14 @@ class VectorStoreService:
             raise
 
 
+def _create_vector_store_service() -> VectorStoreService:
+    """Create the vector store service for the configured backend."""
+    if settings.VECTOR_BACKEND == "faiss":
+        from app.services.faiss_store import FaissVectorStoreService
+        return FaissVectorStoreService()
+    return VectorStoreService()
+
+
 # Singleton instance
-vector_store_service = VectorStoreService()
+vector_store_service = _create_vector_store_service()
 
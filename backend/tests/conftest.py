@@ -1,52 +1,166 @@
 """Pytest fixtures for testing."""
 import asyncio
+import os
+import uuid
 import pytest
-from typing import AsyncGenerator
-from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from pytest_asyncio import is_async_test
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, Tuple
+from unittest.mock import AsyncMock
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+
+try:
+    import uvloop
+except ImportError:  # Not available on Windows
+    uvloop = None
+
+# Cheap password hashing for tests; must be set before settings are loaded
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
 
 from app.main import app
-from app.core.database import Base, get_db
-from app.core.security import get_password_hash
+from app.core.config import settings
+from app.core.database import Base, async_session_maker, get_db
+from app.core.security import create_access_token
 from app.models.user import User
+from app.schemas.chat import SourceDocument
 
 
-# Test database URL (in-memory SQLite)
+def pytest_collection_modifyitems(items):
+    """Run every async test in the session event loop shared with the session fixtures."""
+    session_scope_marker = pytest.mark.asyncio(scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_scope_marker, append=False)
+
+
+def pytest_xdist_auto_num_workers(config) -> int:
+    """Use all but two cores for `-n auto`, leaving headroom for other work."""
+    return max(1, (os.cpu_count() or 1) - 2)
+
+
+# Test database URL (in-memory SQLite, one per process, so each xdist worker
+# gets its own)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
-# Create test engine
+# bcrypt hash of the test user's password, "testpass123" (4 rounds)
+TEST_USER_PASSWORD_HASH = "$2b$04$Ur8ISFYaeIcbUIqXxG.Qd..trP.DgIWm0lcZj4o1TIXiMw9WIC7au"
+
+# Create test engine; StaticPool keeps the single connection (and with it the
+# in-memory database) alive for the whole session
 test_engine = create_async_engine(
     TEST_DATABASE_URL,
     echo=False,
     future=True,
+    poolclass=StaticPool,
+    connect_args={"check_same_thread": False},
 )
 
-# Create test session factory
+
+@event.listens_for(test_engine.sync_engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    """Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work."""
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(test_engine.sync_engine, "begin")
+def _begin_sqlite(conn):
+    """Emit BEGIN explicitly (the driver's implicit transactions are disabled)."""
+    conn.exec_driver_sql("BEGIN")
+
+
+# Create test session factory; sessions are bound to each test's connection,
+# and their commits only release a SAVEPOINT inside the test's transaction
 test_async_session_maker = async_sessionmaker(
-    test_engine,
     class_=AsyncSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
+    join_transaction_mode="create_savepoint",
 )
 
 
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create event loop for async tests."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """Run the tests on uvloop where it is available, as the server does."""
+    if uvloop is not None:
+        return uvloop.EventLoopPolicy()
+    return asyncio.DefaultEventLoopPolicy()
 
 
-@pytest.fixture(autouse=True)
-async def setup_database():
-    """Set up test database before each test."""
+async def _init_schema():
+    """Create the test database schema."""
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+def pytest_sessionstart(session):
+    """Build the schema once per process, before any fixtures are set up."""
+    asyncio.run(_init_schema())
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def setup_database():
+    """Dispose of the test engine at the end of the session."""
     yield
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+    await test_engine.dispose()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_storage(tmp_path_factory):
+    """Keep uploads and the vector store in temporary directories."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "UPLOAD_DIR", str(tmp_path_factory.mktemp("uploads")))
+        mp.setattr(settings, "VECTOR_STORE_PATH", str(tmp_path_factory.mktemp("vector_store")))
+        # Background tasks share the test's one connection (see db_connection),
+        # so process documents one at a time
+        mp.setattr(settings, "MAX_CONCURRENT_UPLOADS", 1)
+        yield
+
+
+@pytest.fixture(autouse=True)
+async def db_connection(setup_database) -> AsyncGenerator[AsyncConnection, None]:
+    """Run each test in a transaction that is rolled back afterwards."""
+    async with test_engine.connect() as conn:
+        transaction = await conn.begin()
+        test_async_session_maker.configure(bind=conn)
+        # Background tasks open sessions from the app's own factory
+        async_session_maker.configure(bind=conn, join_transaction_mode="create_savepoint")
+        yield conn
+        await transaction.rollback()
+
+
+async def _mock_answer_question(question: str, user_id: int, n_sources: int = 5) -> Dict[str, Any]:
+    """Canned answer in the shape returned by LLMService.answer_question."""
+    return {
+        "answer": "Mock answer.",
+        "sources": [
+            SourceDocument(content="Mock source.", document_name="mock.txt", chunk_index=0, relevance_score=0.9),
+        ],
+        "processing_time": 0.01,
+        "question": question,
+    }
+
+
+async def _mock_answer_question_stream(
+    question: str, user_id: int, n_sources: int = 5
+) -> AsyncIterator[Dict[str, Any]]:
+    """Canned events in the shape yielded by LLMService.answer_question_stream."""
+    result = await _mock_answer_question(question, user_id, n_sources)
+    yield {"type": "token", "content": result["answer"]}
+    yield {"type": "done", **result}
+
+
+@pytest.fixture(autouse=True)
+def mock_rag(monkeypatch) -> AsyncMock:
+    """Replace retrieval and answer generation behind /api/ask with canned answers."""
+    from app.services.llm_service import llm_service
+    
+    answer_question = AsyncMock(side_effect=_mock_answer_question)
+    monkeypatch.setattr(llm_service, "answer_question", answer_question)
+    monkeypatch.setattr(llm_service, "answer_question_stream", _mock_answer_question_stream)
+    return answer_question
 
 
 async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -69,37 +183,48 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 async def client() -> AsyncGenerator[AsyncClient, None]:
-    """Provide an async HTTP client for testing."""
+    """Provide an async HTTP client, shared by all tests in the session."""
     app.dependency_overrides[get_db] = override_get_db
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
     app.dependency_overrides.clear()
 
 
-@pytest.fixture
-async def test_user(db_session: AsyncSession) -> User:
-    """Create a test user."""
+@pytest.fixture(scope="session")
+async def test_user(setup_database) -> User:
+    """Create the test user once per session, outside the per-test transactions."""
     user = User(
         email="test@example.com",
         username="testuser",
-        hashed_password=get_password_hash("testpass123"),
+        hashed_password=TEST_USER_PASSWORD_HASH,
         is_active=True,
     )
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
+    async with test_engine.begin() as conn:
+        async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+            session.add(user)
+            await session.flush()
     return user
 
 
-@pytest.fixture
-async def auth_headers(client: AsyncClient, test_user: User) -> dict:
-    """Get authentication headers for test user."""
-    response = await client.post(
-        "/api/auth/login",
-        data={"username": "test@example.com", "password": "testpass123"}
-    )
-    token = response.json()["access_token"]
+@pytest.fixture(scope="session")
+def auth_headers(test_user: User) -> dict:
+    """Sign a token for the test user once and reuse it for the session."""
+    token = create_access_token(data={"sub": str(test_user.id)})
     return {"Authorization": f"Bearer {token}"}
 
+
+@pytest.fixture
+def user_factory(client: AsyncClient) -> Callable[[], Awaitable[Tuple[str, str]]]:
+    """Provide a function that registers a fresh user and returns (email, token)."""
+    async def create_user() -> Tuple[str, str]:
+        name = f"user_{uuid.uuid4().hex[:12]}"
+        email = f"{name}@example.com"
+        response = await client.post(
+            "/api/auth/register",
+            json={"email": email, "username": name, "password": "testpass123"}
+        )
+        return email, response.json()["access_token"]
+    
+    return create_user
@@ -3,6 +3,9 @@ import pytest
 from httpx import AsyncClient
 
 
+pytestmark = pytest.mark.xdist_group(name="auth")
+
+
 @pytest.mark.asyncio
 async def test_register_success(client: AsyncClient):
     """Test successful user registration."""
@@ -33,7 +36,7 @@ async def test_register_duplicate_email(client: AsyncClient, test_user):
         }
     )
     assert response.status_code == 400
-    assert "already registered" in response.json()["detail"]
+    assert b"already registered" in response.content
 
 
 @pytest.mark.asyncio
@@ -70,8 +73,16 @@ async def test_get_current_user(client: AsyncClient, auth_headers):
 
 
 @pytest.mark.asyncio
-async def test_get_current_user_unauthorized(client: AsyncClient):
-    """Test getting current user without auth fails."""
-    response = await client.get("/api/auth/me")
+@pytest.mark.parametrize(
+    "method,path",
+    [
+        ("GET", "/api/auth/me"),
+        ("GET", "/api/docs"),
+        ("POST", "/api/docs/upload"),
+        ("POST", "/api/ask"),
+    ],
+)
+async def test_endpoint_unauthorized(client: AsyncClient, method, path):
+    """Test protected endpoints reject requests without auth."""
+    response = await client.request(method, path)
     assert response.status_code == 401
-
@@ -1,6 +1,12 @@
 """Tests for chat/ask endpoints."""
 import pytest
 from httpx import AsyncClient
+from pydantic import ValidationError
+
+from app.schemas.chat import AskRequest
+
+
+pytestmark = pytest.mark.xdist_group(name="chat")
 
 
 @pytest.mark.asyncio
@@ -19,31 +25,17 @@ async def test_ask_question(client: AsyncClient, auth_headers):
     assert data["question"] == "What is in my documents?"
 
 
-@pytest.mark.asyncio
-async def test_ask_question_without_auth(client: AsyncClient):
-    """Test asking question without authentication fails."""
-    response = await client.post(
-        "/api/ask",
-        json={"question": "What is in my documents?"}
-    )
-    assert response.status_code == 401
-
-
-@pytest.mark.asyncio
-async def test_ask_empty_question(client: AsyncClient, auth_headers):
+def test_ask_empty_question():
     """Test asking an empty question fails validation."""
-    response = await client.post(
-        "/api/ask",
-        json={"question": ""},
-        headers=auth_headers
-    )
-    assert response.status_code == 422
+    with pytest.raises(ValidationError):
+        AskRequest(question="")
 
 
 @pytest.mark.asyncio
-async def test_get_chat_history_empty(client: AsyncClient, auth_headers):
+async def test_get_chat_history_empty(client: AsyncClient, user_factory):
     """Test getting chat history when empty."""
-    response = await client.get("/api/ask/history", headers=auth_headers)
+    _, token = await user_factory()
+    response = await client.get("/api/ask/history", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 200
     data = response.json()
     assert data["messages"] == []
@@ -87,3 +79,82 @@ async def test_clear_chat_history(client: AsyncClient, auth_headers):
     data = response.json()
     assert data["total"] == 0
 
+
+
+@pytest.mark.asyncio
+async def test_delete_chat_message_not_found(client: AsyncClient, auth_headers):
+    """Test deleting a nonexistent chat message returns 404."""
+    response = await client.delete("/api/ask/history/99999", headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_chat_history_offset_past_end(client: AsyncClient, auth_headers):
+    """Test chat history still reports the total when the page is empty."""
+    await client.post(
+        "/api/ask",
+        json={"question": "Question for pagination"},
+        headers=auth_headers
+    )
+    
+    response = await client.get("/api/ask/history?offset=10", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["messages"] == []
+    assert data["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_ask_question_stream(client: AsyncClient, auth_headers):
+    """Test asking a question with a streamed answer."""
+    response = await client.post(
+        "/api/ask",
+        json={"question": "What is in my documents?", "stream": True},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert "event: token" in response.text
+    assert "event: done" in response.text
+
+
+@pytest.mark.asyncio
+async def test_ask_question_stream_saved_to_history(client: AsyncClient, auth_headers):
+    """Test a streamed answer is saved to chat history once complete."""
+    await client.post(
+        "/api/ask",
+        json={"question": "Streamed question for history?", "stream": True},
+        headers=auth_headers
+    )
+    
+    response = await client.get("/api/ask/history", headers=auth_headers)
+    assert response.status_code == 200
+    messages = response.json()["messages"]
+    assert [(msg["question"], msg["answer"]) for msg in messages] == [
+        ("Streamed question for history?", "Mock answer.")
+    ]
+    assert messages[0]["sources"][0]["document_name"] == "mock.txt"
+
+
+@pytest.mark.asyncio
+async def test_answer_stream_keeps_partial_answer_on_error(monkeypatch):
+    """Test a mid-stream failure appends the error to the tokens already sent."""
+    from app.services.llm_service import LLMService
+    
+    async def failing_stream(question: str, context: str):
+        yield "Partial"
+        raise RuntimeError("connection lost")
+    
+    service = LLMService()
+    service._initialized = True
+    service._client = object()
+    monkeypatch.setattr(service, "_generate_stream", failing_stream)
+    
+    events = [event async for event in service.answer_question_stream("Question?", user_id=1)]
+    tokens = "".join(event["content"] for event in events if event["type"] == "token")
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["answer"] == tokens
+    assert done["answer"].startswith("Partial\n\nI encountered an error")
+    assert done["sources"] == []
@@ -0,0 +1,92 @@
+"""Tests for document processing."""
+import asyncio
+import pytest
+
+import app.services.document_processor as document_processor_module
+from app.services.document_processor import (
+    _extract_page_range,
+    _extract_page_range_pypdf,
+    document_processor,
+)
+
+
+def _make_pdf(page_texts):
+    """Build a minimal PDF with one line of Helvetica text per page."""
+    page_count = len(page_texts)
+    font_id = 3 + 2 * page_count
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % (3 + 2 * i) for i in range(page_count)),
+            page_count,
+        ),
+    ]
+    for i, text in enumerate(page_texts):
+        stream = b"BT /F1 12 Tf 72 720 Td (%s) Tj ET" % text.encode()
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_id, 4 + 2 * i)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return pdf
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """Write a two-page PDF and return its path."""
+    path = tmp_path / "sample.pdf"
+    path.write_bytes(_make_pdf(["Hello World", "Second page"]))
+    return str(path)
+
+
+def test_pdf_extraction_golden(sample_pdf):
+    """Test PDFium and pypdf extract the same page texts."""
+    expected = ["Hello World", "Second page"]
+    assert _extract_page_range(sample_pdf, 0, 2) == expected
+    assert _extract_page_range_pypdf(sample_pdf, 0, 2) == expected
+
+
+@pytest.mark.asyncio
+async def test_extract_text_from_pdf(sample_pdf):
+    """Test PDF text extraction joins pages in order."""
+    text = await document_processor.extract_text(sample_pdf, ".pdf")
+    assert text == "Hello World\n\nSecond page"
+
+
+@pytest.mark.asyncio
+async def test_extract_text_from_pdfs_concurrently(tmp_path):
+    """Test concurrent PDF extractions (serialized on PDFium) each get their own text."""
+    paths = []
+    for i in range(8):
+        path = tmp_path / f"doc_{i}.pdf"
+        path.write_bytes(_make_pdf([f"Document {i}"]))
+        paths.append(str(path))
+    
+    texts = await asyncio.gather(*[document_processor.extract_text(path, ".pdf") for path in paths])
+    assert texts == [f"Document {i}" for i in range(8)]
+
+
+@pytest.mark.asyncio
+async def test_split_text_async_in_process_pool(monkeypatch):
+    """Test texts above the process threshold split the same in a worker process."""
+    monkeypatch.setattr(document_processor_module, "PROCESS_SPLIT_THRESHOLD", 100)
+    text = "\n\n".join(f"Paragraph {i}. " + "word " * 50 for i in range(40))
+    
+    try:
+        chunks = await document_processor.split_text_async(text)
+        assert document_processor_module._process_pool is not None
+    finally:
+        document_processor.shutdown()
+    assert len(chunks) > 1
+    assert chunks == document_processor.split_text(text)
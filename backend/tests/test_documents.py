@@ -1,13 +1,18 @@
 """Tests for document endpoints."""
 import pytest
 from httpx import AsyncClient
-from io import BytesIO
+
+from app.core.config import settings
+
+
+pytestmark = pytest.mark.xdist_group(name="docs")
 
 
 @pytest.mark.asyncio
-async def test_list_documents_empty(client: AsyncClient, auth_headers):
+async def test_list_documents_empty(client: AsyncClient, user_factory):
     """Test listing documents when none exist."""
-    response = await client.get("/api/docs", headers=auth_headers)
+    _, token = await user_factory()
+    response = await client.get("/api/docs", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 200
     data = response.json()
     assert data["documents"] == []
@@ -15,11 +20,16 @@ async def test_list_documents_empty(client: AsyncClient, auth_headers):
 
 
 @pytest.mark.asyncio
-async def test_upload_txt_file(client: AsyncClient, auth_headers):
-    """Test uploading a text file."""
-    # Create a simple text file
-    content = b"This is a test document with some content."
-    files = {"files": ("test.txt", BytesIO(content), "text/plain")}
+@pytest.mark.parametrize(
+    "name,ct,ok,fail",
+    [
+        ("test.txt", "text/plain", 1, 0),
+        ("test.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", 0, 1),
+    ],
+)
+async def test_upload(client: AsyncClient, auth_headers, name, ct, ok, fail):
+    """Test uploading an allowed and a disallowed file type."""
+    files = {"files": (name, b"This is a test document with some content.", ct)}
     
     response = await client.post(
         "/api/docs/upload",
@@ -28,17 +38,58 @@ async def test_upload_txt_file(client: AsyncClient, auth_headers):
     )
     assert response.status_code == 200
     data = response.json()
-    assert data["successful"] == 1
-    assert data["failed"] == 0
-    assert len(data["documents"]) == 1
-    assert data["documents"][0]["filename"] == "test.txt"
+    assert data["successful"] == ok
+    assert data["failed"] == fail
+    assert [doc["original_filename"] for doc in data["documents"]] == [name] * ok
+    for doc in data["documents"]:
+        assert doc["filename"].endswith(".txt")
+        assert doc["file_type"] == ".txt"
+        assert doc["status"] == "pending"
+        
+        # Background processing has run by the time the response is returned
+        response = await client.get(f"/api/docs/{doc['id']}", headers=auth_headers)
+        processed = response.json()
+        assert processed["status"] == "completed"
+        assert processed["chunk_count"] == processed["embedding_count"] == 1
 
 
 @pytest.mark.asyncio
-async def test_upload_invalid_file_type(client: AsyncClient, auth_headers):
-    """Test uploading an invalid file type."""
-    content = b"Invalid file content"
-    files = {"files": ("test.docx", BytesIO(content), "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
+async def test_list_documents_after_upload(client: AsyncClient, auth_headers):
+    """Test listing documents includes uploads and totals."""
+    files = {"files": ("notes.txt", b"Some notes to list.", "text/plain")}
+    await client.post("/api/docs/upload", files=files, headers=auth_headers)
+    
+    response = await client.get("/api/docs", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["total_chunks"] == sum(doc["chunk_count"] for doc in data["documents"])
+    assert data["total_embeddings"] == sum(doc["embedding_count"] for doc in data["documents"])
+
+
+@pytest.mark.asyncio
+async def test_delete_document(client: AsyncClient, auth_headers):
+    """Test deleting an uploaded document."""
+    files = {"files": ("delete_me.txt", b"Document to delete.", "text/plain")}
+    response = await client.post("/api/docs/upload", files=files, headers=auth_headers)
+    document_id = response.json()["documents"][0]["id"]
+    
+    response = await client.delete(f"/api/docs/{document_id}", headers=auth_headers)
+    assert response.status_code == 202
+    assert "delete_me.txt" in response.json()["message"]
+    
+    response = await client.delete(f"/api/docs/{document_id}", headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_upload_multiple_files(client: AsyncClient, auth_headers):
+    """Test uploading several files at once with one invalid file."""
+    files = [
+        ("files", ("first.txt", b"First document.", "text/plain")),
+        ("files", ("second.txt", b"Second document.", "text/plain")),
+        ("files", ("third.docx", b"Not allowed.", "application/octet-stream")),
+    ]
     
     response = await client.post(
         "/api/docs/upload",
@@ -47,23 +98,39 @@ async def test_upload_invalid_file_type(client: AsyncClient, auth_headers):
     )
     assert response.status_code == 200
     data = response.json()
-    assert data["successful"] == 0
+    assert data["total_uploaded"] == 3
+    assert data["successful"] == 2
     assert data["failed"] == 1
+    assert len(data["documents"]) == 2
 
 
 @pytest.mark.asyncio
-async def test_upload_without_auth(client: AsyncClient):
-    """Test uploading without authentication fails."""
-    content = b"This is a test document."
-    files = {"files": ("test.txt", BytesIO(content), "text/plain")}
+async def test_upload_alias(client: AsyncClient, auth_headers):
+    """Test the /api/upload alias accepts uploads."""
+    files = {"files": ("alias.txt", b"Uploaded via the alias.", "text/plain")}
     
-    response = await client.post("/api/docs/upload", files=files)
-    assert response.status_code == 401
+    response = await client.post(
+        "/api/upload",
+        files=files,
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["successful"] == 1
 
 
 @pytest.mark.asyncio
-async def test_list_documents_unauthorized(client: AsyncClient):
-    """Test listing documents without auth fails."""
-    response = await client.get("/api/docs")
-    assert response.status_code == 401
-
+async def test_upload_file_too_large(client: AsyncClient, auth_headers, monkeypatch):
+    """Test uploading a file over the size limit."""
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 16)
+    content = b"This content is longer than the limit."
+    files = {"files": ("test.txt", content, "text/plain")}
+    
+    response = await client.post(
+        "/api/docs/upload",
+        files=files,
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["successful"] == 0
+    assert data["failed"] == 1
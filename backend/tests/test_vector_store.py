@@ -0,0 +1,60 @@
+"""Tests for vector store services."""
+import pytest
+
+from app.core.config import settings
+
+
+@pytest.fixture
+def chroma_store(tmp_path, monkeypatch):
+    """Provide a ChromaDB vector store backed by a temporary directory."""
+    from app.services.vector_store import VectorStoreService
+    
+    monkeypatch.setattr(settings, "VECTOR_STORE_PATH", str(tmp_path))
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "")
+    return VectorStoreService()
+
+
+@pytest.fixture
+def faiss_store(tmp_path, monkeypatch):
+    """Provide a FAISS vector store backed by a temporary directory."""
+    pytest.importorskip("faiss")
+    from app.services.faiss_store import FaissVectorStoreService
+    
+    monkeypatch.setattr(settings, "VECTOR_STORE_PATH", str(tmp_path))
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "")
+    return FaissVectorStoreService()
+
+
+@pytest.mark.asyncio
+async def test_chroma_search_scores_are_cosine_similarities(chroma_store):
+    """Test ChromaDB search over unit-length embeddings scores an exact match as 1."""
+    await chroma_store.add_documents(["alpha chunk", "beta chunk"], 1, "mine.txt", user_id=1)
+    
+    results = await chroma_store.search("alpha chunk", user_id=1, n_results=2)
+    assert results[0]["content"] == "alpha chunk"
+    assert results[0]["relevance_score"] == pytest.approx(1.0, abs=1e-3)
+    assert results[1]["relevance_score"] < results[0]["relevance_score"]
+
+
+@pytest.mark.asyncio
+async def test_faiss_search_is_scoped_to_user(faiss_store):
+    """Test FAISS search only returns the requesting user's chunks."""
+    await faiss_store.add_documents(["alpha chunk", "beta chunk"], 1, "mine.txt", user_id=1)
+    await faiss_store.add_documents(["alpha chunk"], 2, "theirs.txt", user_id=2)
+    
+    results = await faiss_store.search("alpha chunk", user_id=1, n_results=5)
+    assert len(results) == 2
+    assert results[0]["content"] == "alpha chunk"
+    assert results[0]["relevance_score"] == pytest.approx(1.0, abs=1e-4)
+    assert all(r["metadata"]["user_id"] == 1 for r in results)
+    assert await faiss_store.get_total_count() == 3
+
+
+@pytest.mark.asyncio
+async def test_faiss_delete_document(faiss_store):
+    """Test deleting a document removes its chunks from FAISS search."""
+    await faiss_store.add_documents(["first", "second"], 1, "doc.txt", user_id=1)
+    
+    assert await faiss_store.delete_document(1)
+    assert await faiss_store.search("first", user_id=1) == []
+    assert await faiss_store.get_document_count(1) == 0